@@ -1,22 +1,51 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QLabel, QComboBox, QPushButton, QFrame, QMessageBox,
                             QTextEdit)
-from PyQt6.QtCore import Qt, QPoint, QTimer, pyqtSignal
-from typing import Dict
+from PyQt6.QtCore import Qt, QPoint, QPointF, QTimer, QSignalBlocker, pyqtSignal
+from typing import Dict, Optional
+from types import MappingProxyType
 from pynput import mouse
 from lifai.utils.ollama_client import OllamaClient
 from lifai.utils.logger_utils import get_module_logger
-from lifai.config.saved_prompts import llm_prompts
+from lifai.config.prompts import llm_prompts
 from lifai.utils.clipboard_utils import ClipboardManager
 from lifai.utils.knowledge_base import KnowledgeBase
 import time
 import threading
+import queue
+import hashlib
+import json
+from collections import OrderedDict
 
 logger = get_module_logger(__name__)
 
+# 缓存的模型回复数量上限
+RESPONSE_CACHE_SIZE = 128
+
+# 单次模型请求的超时时间（秒），避免一个卡住的请求阻塞后续所有任务
+LLM_REQUEST_TIMEOUT = 120
+
+# 系统提示词固定不变，在模块加载时构建一次
+RAG_SYSTEM_PROMPT = """You are an AI assistant with access to a knowledge base that contains important reference information.
+
+Instructions for Using Knowledge Base:
+1. FIRST, carefully analyze the knowledge base context and identify relevant information
+2. When you find relevant information:
+   - Use it to better understand the context and requirements
+   - Ensure your response is consistent with the knowledge base
+3. For the rest of the text:
+   - Process it according to the task description
+   - Maintain consistency with the knowledge base information
+
+Remember:
+- The knowledge base contains authoritative information - always prefer it when available
+- Maintain the overall flow and style while incorporating knowledge base information
+- Ensure all terms and concepts are correctly interpreted according to the knowledge base"""
+
+DIRECT_SYSTEM_PROMPT = """You are an AI assistant that helps improve and enhance text."""
+
 class FloatingToolbarModule(QMainWindow):
     # 定义信号
-    text_processed = pyqtSignal(str)
     selection_finished = pyqtSignal()
     show_error = pyqtSignal(str, str)
 
@@ -26,12 +55,23 @@ class FloatingToolbarModule(QMainWindow):
         self.ollama_client = ollama_client
         self.knowledge_base = KnowledgeBase()  # 初始化知识库
         self.clipboard = ClipboardManager()  # 初始化剪贴板管理器
+        self._clipboard_lock = threading.Lock()  # 串行化剪贴板读取和粘贴，避免并发操作互相覆盖
+        self.llm_prompts = MappingProxyType(llm_prompts)  # 只读视图，编辑器原地更新后自动可见
+        
+        # 最近的模型回复缓存，只在后台工作线程中访问
+        self._response_cache = OrderedDict()
+        self._cache_model = None  # 缓存内容对应的模型
+        self._last_request_key = None  # 上一次请求的缓存键
+        
+        # 文本处理任务队列，由单个常驻后台线程依次执行
+        self._task_queue = queue.Queue()
+        threading.Thread(target=self._task_worker, daemon=True).start()
+        
         self.setup_ui()
         self.setup_hotkeys()
         self.hide()
         
         # 连接信号
-        self.text_processed.connect(self._handle_processed_text)
         self.selection_finished.connect(self._reset_ui)
         self.show_error.connect(self._show_error_dialog)
 
@@ -65,7 +105,10 @@ class FloatingToolbarModule(QMainWindow):
         
         # 创建提示选择下拉框
         self.prompt_combo = QComboBox()
-        self.prompt_combo.addItems(list(llm_prompts.keys()))  # 直接使用 llm_prompts 的键
+        self._prompt_items = tuple(self.llm_prompts.keys())  # 当前下拉框中的提示词
+        self.prompt_combo.addItems(list(self._prompt_items))  # 直接使用 llm_prompts 的键
+        self.current_prompt = self.prompt_combo.currentText()
+        self.prompt_combo.currentTextChanged.connect(self._on_prompt_changed)
         main_layout.addWidget(self.prompt_combo)
         
         # 创建增强按钮
@@ -83,6 +126,9 @@ class FloatingToolbarModule(QMainWindow):
         self.waiting_for_selection = False
         self.mouse_down = False
         self.mouse_down_time = None
+        self.last_click_edge = 0.0
+        self.mouse_listener = None
+        self.selection_handler = None
         self.mini_window = None
         
         # 设置鼠标追踪
@@ -90,6 +136,19 @@ class FloatingToolbarModule(QMainWindow):
         title_frame.mousePressEvent = self.start_drag
         title_frame.mouseMoveEvent = self.on_drag
 
+    def _task_worker(self):
+        """后台工作线程，依次执行排队的文本处理任务"""
+        while True:
+            task, text = self._task_queue.get()
+            try:
+                task(text)
+            except Exception as e:
+                logger.error(f"Error in toolbar worker: {e}")
+
+    def _on_prompt_changed(self, name: str):
+        """缓存当前选择的提示词名称，供后台线程读取"""
+        self.current_prompt = name
+
     def setup_hotkeys(self):
         """设置快捷键"""
         pass  # 暂时不实现快捷键功能
@@ -112,13 +171,13 @@ class FloatingToolbarModule(QMainWindow):
     def start_drag(self, event):
         """开始拖动窗口"""
         if event.button() == Qt.MouseButton.LeftButton:
-            self.drag_position = event.globalPosition().toPoint() - self.frameGeometry().topLeft()
+            self.drag_position = event.globalPosition() - QPointF(self.frameGeometry().topLeft())
             event.accept()
         
     def on_drag(self, event):
         """处理窗口拖动"""
-        if event.buttons() == Qt.MouseButton.LeftButton and self.drag_position:
-            self.move(event.globalPosition().toPoint() - self.drag_position)
+        if event.buttons() == Qt.MouseButton.LeftButton and self.drag_position is not None:
+            self.move((event.globalPosition() - self.drag_position).toPoint())
             event.accept()
 
     def start_enhancement(self):
@@ -128,71 +187,79 @@ class FloatingToolbarModule(QMainWindow):
             
         self.enhance_btn.setText("Select text now...")
         self.enhance_btn.setEnabled(False)
+        self.begin_selection(self._process_text_thread)
+
+    def begin_selection(self, handler):
+        """开始等待文本选择
+        
+        Args:
+            handler: 选择完成后在后台线程中处理文本的方法
+        """
+        self.mouse_down = False
+        self.selection_handler = handler
         self.waiting_for_selection = True
         
-        # 在单独的线程中等待选择
-        threading.Thread(target=self.wait_for_selection, daemon=True).start()
+        try:
+            # 鼠标监听器常驻复用，只在首次使用或停止后重新创建
+            if self.mouse_listener is None or not self.mouse_listener.is_alive():
+                self.mouse_listener = mouse.Listener(on_click=self.on_click)
+                self.mouse_listener.start()
+        except Exception as e:
+            logger.error(f"Error waiting for selection: {e}")
+            self.show_error.emit("Error", f"Error waiting for selection: {e}")
+            self.waiting_for_selection = False
+            self.selection_finished.emit()
 
-    def wait_for_selection(self):
-        """等待文本选择并处理"""
+    def on_click(self, x, y, button, pressed):
+        """鼠标点击回调，仅在等待选择时处理左键事件"""
+        if not self.waiting_for_selection or button != mouse.Button.left:
+            return
+            
         try:
-            self.mouse_down = False
-            self.is_selecting = False  # 标记是否正在进行选择操作
+            # 忽略40毫秒内重复的按键边沿（鼠标按键抖动）
+            now = time.monotonic()
+            if now - self.last_click_edge < 0.04:
+                return
+            self.last_click_edge = now
             
-            def on_click(x, y, button, pressed):
-                if button == mouse.Button.left:
-                    if pressed:
-                        # 记录鼠标按下的时间和位置
-                        self.mouse_down = True
-                        self.mouse_down_time = time.time()
-                        self.mouse_down_pos = (x, y)
+            if pressed:
+                # 记录鼠标按下的时间和位置
+                self.mouse_down = True
+                self.mouse_down_time = time.monotonic()
+                self.mouse_down_pos = (x, y)
+            else:  # 鼠标释放
+                # 按住至少0.5秒才视为选择操作
+                if self.mouse_down and now - self.mouse_down_time >= 0.5:
+                    # 计算鼠标移动距离的平方，避免开方
+                    dx = x - self.mouse_down_pos[0]
+                    dy = y - self.mouse_down_pos[1]
+                    move_distance_sq = dx * dx + dy * dy
+                    
+                    # 如果确实发生了移动
+                    if move_distance_sq > 100:  # 10像素的移动阈值
+                        with self._clipboard_lock:
+                            selected_text = self.clipboard.get_selected_text()
+                        if not self.waiting_for_selection:
+                            # 读取剪贴板期间工具栏已被隐藏，放弃这次选择
+                            logger.debug("Selection cancelled while reading clipboard")
+                        elif selected_text:
+                            logger.debug("Selection complete, moved %s px²: %s...", move_distance_sq, selected_text[:100])
+                            self.waiting_for_selection = False
+                            # 交给后台工作线程处理文本
+                            self._task_queue.put((self.selection_handler, selected_text))
+                            self.selection_finished.emit()
+                    else:
+                        logger.debug("Ignored selection without movement (%s px²)", move_distance_sq)
                         
-                        # 启动一个线程来检测长按
-                        def check_long_press():
-                            time.sleep(0.5)  # 等待0.5秒
-                            if self.mouse_down:  # 如果鼠标还在按下状态
-                                self.is_selecting = True
-                                logger.debug("Long press detected, user is selecting text...")
-                        
-                        threading.Thread(target=check_long_press, daemon=True).start()
-                        
-                    else:  # 鼠标释放
-                        if self.mouse_down and self.is_selecting:
-                            # 计算鼠标移动距离
-                            current_pos = (x, y)
-                            move_distance = ((current_pos[0] - self.mouse_down_pos[0]) ** 2 + 
-                                          (current_pos[1] - self.mouse_down_pos[1]) ** 2) ** 0.5
-                            
-                            # 如果确实发生了移动
-                            if move_distance > 10:  # 10像素的移动阈值
-                                selected_text = self.clipboard.get_selected_text()
-                                if selected_text:
-                                    logger.debug(f"Selection complete, moved {move_distance:.1f}px: {selected_text[:100]}...")
-                                    self.waiting_for_selection = False
-                                    # 在新线程中处理文本
-                                    threading.Thread(
-                                        target=self._process_text_thread,
-                                        args=(selected_text,),
-                                        daemon=True
-                                    ).start()
-                                    return False  # 停止监听
-                            else:
-                                logger.debug(f"Ignored selection without movement ({move_distance:.1f}px)")
-                                
-                        # 重置状态
-                        self.mouse_down = False
-                        self.is_selecting = False
-                        self.mouse_down_time = None
-                        self.mouse_down_pos = None
-            
-            # 启动鼠标监听
-            with mouse.Listener(on_click=on_click) as listener:
-                listener.join()
+                # 重置状态
+                self.mouse_down = False
+                self.mouse_down_time = None
+                self.mouse_down_pos = None
                 
         except Exception as e:
             logger.error(f"Error waiting for selection: {e}")
             self.show_error.emit("Error", f"Error waiting for selection: {e}")
-        finally:
+            self.waiting_for_selection = False
             self.selection_finished.emit()
 
     def _process_text_thread(self, text: str):
@@ -204,10 +271,10 @@ class FloatingToolbarModule(QMainWindow):
         try:
             # 检查知识库状态
             doc_count = self.knowledge_base.get_document_count()
-            logger.info(f"Current knowledge base contains {doc_count} documents")
+            logger.info("Current knowledge base contains %d documents", doc_count)
             
             # 获取相关上下文，使用更宽松的参数以获取更多结果
-            logger.info(f"Attempting to retrieve context for text: {text[:100]}...")
+            logger.info("Attempting to retrieve context for text: %s...", text[:100])
             
             try:
                 # 使用更宽松的参数
@@ -221,43 +288,30 @@ class FloatingToolbarModule(QMainWindow):
                 context = None
             
             if context:
-                logger.info(f"Successfully retrieved context: {context[:200]}...")
+                logger.info("Successfully retrieved context: %s...", context[:200])
             else:
                 logger.warning("No context retrieved from knowledge base")
             
             # 获取当前选择的提示模板
             try:
-                current_prompt = self.prompt_combo.currentText()
-                logger.info(f"Using prompt template: {current_prompt}")
-                prompt_template = llm_prompts.get(current_prompt, "Please improve this text.")
+                current_prompt = self.current_prompt
+                logger.info("Using prompt template: %s", current_prompt)
+                prompt_template = self.llm_prompts.get(current_prompt, "Please improve this text.")
             except Exception as e:
                 logger.error(f"Error getting prompt template: {e}")
                 prompt_template = "Please improve this text."
             
             # 构建系统提示词
-            system_prompt = """You are an AI assistant with access to a knowledge base that contains important reference information.
-
-Instructions for Using Knowledge Base:
-1. FIRST, carefully analyze the knowledge base context and identify relevant information
-2. When you find relevant information:
-   - Use it to better understand the context and requirements
-   - Ensure your response is consistent with the knowledge base
-3. For the rest of the text:
-   - Process it according to the task description
-   - Maintain consistency with the knowledge base information
-
-Remember:
-- The knowledge base contains authoritative information - always prefer it when available
-- Maintain the overall flow and style while incorporating knowledge base information
-- Ensure all terms and concepts are correctly interpreted according to the knowledge base"""
+            system_prompt = RAG_SYSTEM_PROMPT
             
             # 构建用户提示词，始终包含上下文部分
-            user_prompt = f"""Knowledge Base Context:
-{context if context else "No relevant context found in knowledge base."}
-
-Task Instructions and Guidelines:
+            # 固定的任务说明放在最前面，使同一提示词的请求共享前缀，便于后端复用提示词缓存
+            user_prompt = f"""Task Instructions and Guidelines:
 {prompt_template}
 
+Knowledge Base Context:
+{context if context else "No relevant context found in knowledge base."}
+
 Text to Process:
 {text}
 
@@ -271,18 +325,14 @@ Please explicitly follow the task instructions and guidelines, and incorporating
                 ]
                 
                 logger.info("Sending prompts to LM Studio:")
-                logger.info(f"System prompt:\n{system_prompt}")
-                logger.info(f"User prompt:\n{user_prompt}")
+                logger.info("System prompt:\n%s", system_prompt)
+                logger.info("User prompt:\n%s", user_prompt)
                 
-                response = self.ollama_client.chat_completion(
-                    messages=messages,
-                    model=self.settings.get('model', 'mistral')
-                )
+                result = self._chat_completion(messages)
                 
-                if response and 'choices' in response and len(response['choices']) > 0:
-                    result = response['choices'][0]['message']['content'].strip()
+                if result is not None:
                     logger.info("Successfully processed text")
-                    self.text_processed.emit(result)  # 使用信号发送结果
+                    self._replace_selected_text(result)  # 在工作线程中按顺序粘贴
                 else:
                     logger.error("Failed to process text: Invalid response format")
                     self.show_error.emit("Error", "Failed to generate improved text")
@@ -302,6 +352,52 @@ Please explicitly follow the task instructions and guidelines, and incorporating
             except Exception as e:
                 logger.error(f"Error in cleanup: {e}")
 
+    def _chat_completion(self, messages) -> Optional[str]:
+        """调用模型生成回复，相同的请求直接返回缓存的结果
+        
+        紧接着重复上一次的请求时视为重新生成，跳过缓存。
+        
+        Args:
+            messages: 发送给模型的消息列表
+            
+        Returns:
+            模型回复文本，响应格式无效时返回 None
+        """
+        model = self.settings.get('model', 'mistral')
+        if model != self._cache_model:
+            # 切换模型或后端后旧的回复不再适用
+            self._response_cache.clear()
+            self._cache_model = model
+        
+        # 缓存键只包含实际发送给后端的内容
+        key = hashlib.blake2b(
+            json.dumps(messages, ensure_ascii=False).encode('utf-8'),
+            digest_size=16
+        ).digest()
+        repeated = key == self._last_request_key
+        self._last_request_key = key
+        
+        cached = None if repeated else self._response_cache.get(key)
+        if cached is not None:
+            self._response_cache.move_to_end(key)
+            logger.info("Using cached response for identical request")
+            return cached
+        
+        response = self.ollama_client.chat_completion(
+            messages=messages,
+            model=model,
+            timeout=LLM_REQUEST_TIMEOUT
+        )
+        
+        if response and 'choices' in response and len(response['choices']) > 0:
+            result = response['choices'][0]['message']['content'].strip()
+            self._response_cache[key] = result
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)  # 淘汰最久未使用的结果
+            return result
+        return None
+
     def update_button_state(self):
         """更新按钮状态"""
         try:
@@ -313,16 +409,20 @@ Please explicitly follow the task instructions and guidelines, and incorporating
         except Exception as e:
             logger.error(f"Error updating button state: {e}")
 
-    def _handle_processed_text(self, text: str):
-        """在主线程中处理处理后的文本"""
+    def _replace_selected_text(self, text: str):
+        """在后台工作线程中粘贴处理后的文本
+        
+        粘贴与文本处理共用同一个工作线程，多次结果按排队顺序依次粘贴；
+        剪贴板锁防止与监听线程读取选中文本同时进行。
+        """
         try:
             if not text:
                 logger.warning("Received empty processed text")
                 return
                 
             logger.debug("Replacing selected text...")
-            self.clipboard.replace_selected_text(text)
-            logger.debug("Text replacement complete")
+            with self._clipboard_lock:
+                self.clipboard.replace_selected_text(text)
         except Exception as e:
             logger.error(f"Error replacing text: {e}")
             self.show_error.emit("Error", f"Error replacing text: {e}")
@@ -330,15 +430,25 @@ Please explicitly follow the task instructions and guidelines, and incorporating
     def _reset_ui(self):
         """在主线程中重置 UI 状态"""
         try:
-            self.waiting_for_selection = False
-            self.enhance_btn.setText("✨ Select & Enhance (with RAG)")
-            self.enhance_btn.setEnabled(True)
-            self.direct_enhance_btn.setText("✨ Select & Enhance (Direct)")
-            self.direct_enhance_btn.setEnabled(True)
+            self._reset_buttons()
             self.show()
         except Exception as e:
             logger.error(f"Error resetting UI: {e}")
 
+    def _reset_buttons(self):
+        """取消等待选择并恢复按钮状态"""
+        self.waiting_for_selection = False
+        self.enhance_btn.setText("✨ Select & Enhance (with RAG)")
+        self.enhance_btn.setEnabled(True)
+        self.direct_enhance_btn.setText("✨ Select & Enhance (Direct)")
+        self.direct_enhance_btn.setEnabled(True)
+
+    def _stop_mouse_listener(self):
+        """停止全局鼠标监听器，下次开始选择时会重新创建"""
+        if self.mouse_listener is not None:
+            self.mouse_listener.stop()
+            self.mouse_listener = None
+
     def _show_error_dialog(self, title: str, message: str):
         """在主线程中显示错误对话框"""
         try:
@@ -352,11 +462,26 @@ Please explicitly follow the task instructions and guidelines, and incorporating
             # 清理资源
             self.waiting_for_selection = False
             self.processing = False
+            self._stop_mouse_listener()
             super().closeEvent(event)
         except Exception as e:
             logger.error(f"Error in close event: {e}")
             event.accept()
 
+    def hideEvent(self, event):
+        """处理窗口隐藏事件
+
+        工具栏被关闭或最小化时只会隐藏而不会收到 closeEvent，
+        在这里卸载全局鼠标钩子并取消未完成的选择。
+        """
+        try:
+            if self.waiting_for_selection:
+                self._reset_buttons()
+            self._stop_mouse_listener()
+        except Exception as e:
+            logger.error(f"Error in hide event: {e}")
+        super().hideEvent(event)
+
     def start_direct_enhancement(self):
         """开始直接文本增强（不使用知识库）"""
         if self.waiting_for_selection:
@@ -364,72 +489,7 @@ Please explicitly follow the task instructions and guidelines, and incorporating
             
         self.direct_enhance_btn.setText("Select text now...")
         self.direct_enhance_btn.setEnabled(False)
-        self.waiting_for_selection = True
-        
-        # 在单独的线程中等待选择
-        threading.Thread(target=self.wait_for_direct_selection, daemon=True).start()
-        
-    def wait_for_direct_selection(self):
-        """等待文本选择并直接处理（不使用知识库）"""
-        try:
-            self.mouse_down = False
-            self.is_selecting = False
-            
-            def on_click(x, y, button, pressed):
-                if button == mouse.Button.left:
-                    if pressed:
-                        # 记录鼠标按下的时间和位置
-                        self.mouse_down = True
-                        self.mouse_down_time = time.time()
-                        self.mouse_down_pos = (x, y)
-                        
-                        # 启动一个线程来检测长按
-                        def check_long_press():
-                            time.sleep(0.5)  # 等待0.5秒
-                            if self.mouse_down:  # 如果鼠标还在按下状态
-                                self.is_selecting = True
-                                logger.debug("Long press detected, user is selecting text...")
-                        
-                        threading.Thread(target=check_long_press, daemon=True).start()
-                        
-                    else:  # 鼠标释放
-                        if self.mouse_down and self.is_selecting:
-                            # 计算鼠标移动距离
-                            current_pos = (x, y)
-                            move_distance = ((current_pos[0] - self.mouse_down_pos[0]) ** 2 + 
-                                          (current_pos[1] - self.mouse_down_pos[1]) ** 2) ** 0.5
-                            
-                            # 如果确实发生了移动
-                            if move_distance > 10:  # 10像素的移动阈值
-                                selected_text = self.clipboard.get_selected_text()
-                                if selected_text:
-                                    logger.debug(f"Selection complete, moved {move_distance:.1f}px: {selected_text[:100]}...")
-                                    self.waiting_for_selection = False
-                                    # 在新线程中处理文本
-                                    threading.Thread(
-                                        target=self._process_text_direct_thread,
-                                        args=(selected_text,),
-                                        daemon=True
-                                    ).start()
-                                    return False  # 停止监听
-                            else:
-                                logger.debug(f"Ignored selection without movement ({move_distance:.1f}px)")
-                                
-                        # 重置状态
-                        self.mouse_down = False
-                        self.is_selecting = False
-                        self.mouse_down_time = None
-                        self.mouse_down_pos = None
-            
-            # 启动鼠标监听
-            with mouse.Listener(on_click=on_click) as listener:
-                listener.join()
-                
-        except Exception as e:
-            logger.error(f"Error waiting for selection: {e}")
-            self.show_error.emit("Error", f"Error waiting for selection: {e}")
-        finally:
-            self.selection_finished.emit()
+        self.begin_selection(self._process_text_direct_thread)
             
     def _process_text_direct_thread(self, text: str):
         """在单独的线程中直接处理文本（不使用知识库）
@@ -440,15 +500,15 @@ Please explicitly follow the task instructions and guidelines, and incorporating
         try:
             # 获取当前选择的提示模板
             try:
-                current_prompt = self.prompt_combo.currentText()
-                logger.info(f"Using prompt template: {current_prompt}")
-                prompt_template = llm_prompts.get(current_prompt, "Please improve this text.")
+                current_prompt = self.current_prompt
+                logger.info("Using prompt template: %s", current_prompt)
+                prompt_template = self.llm_prompts.get(current_prompt, "Please improve this text.")
             except Exception as e:
                 logger.error(f"Error getting prompt template: {e}")
                 prompt_template = "Please improve this text."
             
             # 构建系统提示词
-            system_prompt = """You are an AI assistant that helps improve and enhance text."""
+            system_prompt = DIRECT_SYSTEM_PROMPT
             
             # 构建用户提示词
             user_prompt = f"""Task Instructions and Guidelines:
@@ -467,18 +527,14 @@ Please explicitly follow the task instructions and guidelines to complete the ta
                 ]
                 
                 logger.info("Sending prompts to LM Studio:")
-                logger.info(f"System prompt:\n{system_prompt}")
-                logger.info(f"User prompt:\n{user_prompt}")
+                logger.info("System prompt:\n%s", system_prompt)
+                logger.info("User prompt:\n%s", user_prompt)
                 
-                response = self.ollama_client.chat_completion(
-                    messages=messages,
-                    model=self.settings.get('model', 'mistral')
-                )
+                result = self._chat_completion(messages)
                 
-                if response and 'choices' in response and len(response['choices']) > 0:
-                    result = response['choices'][0]['message']['content'].strip()
+                if result is not None:
                     logger.info("Successfully processed text")
-                    self.text_processed.emit(result)  # 使用信号发送结果
+                    self._replace_selected_text(result)  # 在工作线程中按顺序粘贴
                 else:
                     logger.error("Failed to process text: Invalid response format")
                     self.show_error.emit("Error", "Failed to generate improved text")
@@ -516,22 +572,43 @@ Please explicitly follow the task instructions and guidelines to complete the ta
             prompt_keys: 可选的提示词键列表，如果为None则使用全局llm_prompts
         """
         try:
+            items = tuple(prompt_keys) if prompt_keys is not None else tuple(self.llm_prompts.keys())
+            
+            # 列表未变化时无需重建下拉框
+            if items == self._prompt_items:
+                logger.debug("Prompts list unchanged in floating toolbar")
+                return
+            
             # 保存当前选择
             current_text = self.prompt_combo.currentText()
             
-            # 清空并重新填充
-            self.prompt_combo.clear()
-            if prompt_keys is not None:
-                self.prompt_combo.addItems(prompt_keys)
-            else:
-                self.prompt_combo.addItems(list(llm_prompts.keys()))
-            
-            # 尝试恢复之前的选择
-            index = self.prompt_combo.findText(current_text)
-            if index >= 0:
+            # 重建期间屏蔽信号并暂停重绘，避免每次插入和清空都触发选择变化和刷新
+            blocker = QSignalBlocker(self.prompt_combo)
+            self.prompt_combo.setUpdatesEnabled(False)
+            try:
+                if len(items) == len(self._prompt_items):
+                    # 数量未变时只修改变化的条目
+                    for i, (old_name, new_name) in enumerate(zip(self._prompt_items, items)):
+                        if old_name != new_name:
+                            self.prompt_combo.setItemText(i, new_name)
+                else:
+                    # 清空并重新填充
+                    self.prompt_combo.clear()
+                    self.prompt_combo.addItems(list(items))
+                self._prompt_items = items
+                
+                # 尝试恢复之前的选择（下拉框条目与 items 一一对应，无需再查询下拉框）
+                try:
+                    index = items.index(current_text)
+                except ValueError:
+                    index = 0 if items else -1
                 self.prompt_combo.setCurrentIndex(index)
-            elif self.prompt_combo.count() > 0:
-                self.prompt_combo.setCurrentIndex(0)
+            finally:
+                self.prompt_combo.setUpdatesEnabled(True)
+                blocker.unblock()
+            
+            # 信号被屏蔽，手动同步缓存的提示词名称
+            self._on_prompt_changed(self.prompt_combo.currentText())
                 
             logger.info("Prompts list updated in floating toolbar")
         except Exception as e:
@@ -566,13 +643,13 @@ class FloatingMiniWindow(QMainWindow):
     def mousePressEvent(self, event):
         """开始拖动窗口"""
         if event.button() == Qt.MouseButton.LeftButton:
-            self.drag_position = event.globalPosition().toPoint() - self.frameGeometry().topLeft()
+            self.drag_position = event.globalPosition() - QPointF(self.frameGeometry().topLeft())
             event.accept()
             
     def mouseMoveEvent(self, event):
         """处理窗口拖动"""
-        if event.buttons() == Qt.MouseButton.LeftButton and self.drag_position:
-            self.move(event.globalPosition().toPoint() - self.drag_position)
+        if event.buttons() == Qt.MouseButton.LeftButton and self.drag_position is not None:
+            self.move((event.globalPosition() - self.drag_position).toPoint())
             event.accept()
 
     
\ No newline at end of file
@@ -9,6 +9,9 @@ from lifai.utils.logger_utils import get_module_logger
 
 logger = get_module_logger(__name__)
 
+# 匹配全大写缩写词（如 API、RAG）
+_ABBREVIATION_RE = re.compile(r'\b[A-Z]{2,}\b')
+
 class Document:
     """文档类，用于存储文档内容和元数据"""
     def __init__(self, page_content: str, metadata: dict = None):
@@ -83,7 +86,7 @@ class KnowledgeBase:
         """
         # 首先保护缩写词
         protected_text = text
-        abbreviations = re.findall(r'\b[A-Z]{2,}\b', text)
+        abbreviations = _ABBREVIATION_RE.findall(text)
         placeholders = {}
         for i, abbr in enumerate(abbreviations):
             placeholder = f"__ABR{i}__"
@@ -244,7 +247,7 @@ class KnowledgeBase:
                 return ""
             
             # 提取查询中的缩写词
-            abbreviations = set(re.findall(r'\b[A-Z]{2,}\b', query))
+            abbreviations = set(_ABBREVIATION_RE.findall(query))
             logger.info(f"Found abbreviations in query: {abbreviations}")
             
             # 计算查询的嵌入向量
@@ -268,30 +271,31 @@ class KnowledgeBase:
             seen_abbrs = set()  # 用于跟踪已处理的缩写词
             added_docs = set()  # 用于跟踪已添加的文档
             
-            # 第一轮：优先添加包含任何查询缩写词的文档
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx < 0 or idx >= len(self.documents):  # 添加索引检查
-                    continue
+            # 第一轮：优先添加包含任何查询缩写词的文档（查询中没有缩写词时跳过）
+            if abbreviations:
+                for dist, idx in zip(distances[0], indices[0]):
+                    if idx < 0 or idx >= len(self.documents):  # 添加索引检查
+                        continue
                     
-                doc = self.documents[idx]
-                if doc in added_docs:
-                    continue
+                    doc = self.documents[idx]
+                    if doc in added_docs:
+                        continue
                     
-                similarity = 1 - (dist / 2)  # 转换距离为相似度
-                if similarity < threshold:
-                    continue
+                    similarity = 1 - (dist / 2)  # 转换距离为相似度
+                    if similarity < threshold:
+                        continue
                 
-                # 检查文档中的缩写词
-                doc_abbrs = set(re.findall(r'\b[A-Z]{2,}\b', doc))
-                matching_abbrs = doc_abbrs.intersection(abbreviations)
+                    # 检查文档中的缩写词
+                    doc_abbrs = set(_ABBREVIATION_RE.findall(doc))
+                    matching_abbrs = doc_abbrs.intersection(abbreviations)
                 
-                if matching_abbrs:
-                    context_parts.append(
-                        f"[Relevance: {similarity:.2%}]\n{doc}"
-                    )
-                    seen_abbrs.update(matching_abbrs)
-                    added_docs.add(doc)
-                    logger.info(f"Found relevant context with abbreviations {matching_abbrs}")
+                    if matching_abbrs:
+                        context_parts.append(
+                            f"[Relevance: {similarity:.2%}]\n{doc}"
+                        )
+                        seen_abbrs.update(matching_abbrs)
+                        added_docs.add(doc)
+                        logger.info(f"Found relevant context with abbreviations {matching_abbrs}")
             
             # 第二轮：添加其他相关文档
             remaining_slots = k - len(context_parts)
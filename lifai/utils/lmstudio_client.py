@@ -55,7 +55,7 @@ class LMStudioClient:
             logging.error(f"Error generating response from LM Studio: {e}")
             raise
 
-    def chat_completion(self, messages, model=None, temperature=0.7):
+    def chat_completion(self, messages, model=None, temperature=0.7, timeout=None):
         try:
             response = requests.post(
                 f"{self.base_url}/chat/completions",
@@ -63,7 +63,8 @@ class LMStudioClient:
                     "messages": messages,
                     "temperature": temperature,
                     "stream": False
-                }
+                },
+                timeout=timeout
             )
             response.raise_for_status()
             return response.json()